@@ -2,6 +2,7 @@ from __future__ import annotations
 
 from sys import getsizeof
 import re
+from functools import lru_cache
 from typing import Dict, Iterable, Tuple, Union, Mapping
 from amulet_nbt import ByteTag, ShortTag, IntTag, LongTag, StringTag, from_snbt
 
@@ -26,6 +27,30 @@ PropertyDataTypes = (
 )
 
 
+@lru_cache(maxsize=8192)
+def _string_properties(properties: Tuple[Tuple[str, PropertyValueType], ...]) -> str:
+    """
+    Get the Java blockstate properties string for a sorted tuple of property items.
+    Only the StringTag values are included.
+    """
+    return ",".join(
+        f"{key}={value.py_str}"
+        for key, value in properties
+        if isinstance(value, StringTag)
+    )
+
+
+@lru_cache(maxsize=8192)
+def _snbt_properties(
+    properties: Tuple[Tuple[str, type, PropertyValueType], ...]
+) -> str:
+    """
+    Get the SNBT blockstate properties string for a sorted tuple of property items.
+    The tag class is part of the key because tags of different numerical types compare equal.
+    """
+    return ",".join(f"{key}={value.to_snbt()}" for key, _, value in properties)
+
+
 class Block:
     """
     A class to manage the state of a block.
@@ -267,13 +292,9 @@ class Block:
         """
         if self._blockstate is None:
             self._blockstate = self.namespaced_name
-            if self.properties:
-                props = [
-                    f"{key}={value.py_str}"
-                    for key, value in sorted(self.properties.items())
-                    if isinstance(value, StringTag)
-                ]
-                self._blockstate += f"[{','.join(props)}]"
+            if self._properties:
+                props = _string_properties(tuple(sorted(self._properties.items())))
+                self._blockstate += f"[{props}]"
         return self._blockstate
 
     @property
@@ -295,12 +316,14 @@ class Block:
         """
         if self._snbt_blockstate is None:
             self._snbt_blockstate = self.namespaced_name
-            if self.properties:
-                props = [
-                    f"{key}={value.to_snbt()}"
-                    for key, value in sorted(self.properties.items())
-                ]
-                self._snbt_blockstate += f"[{','.join(props)}]"
+            if self._properties:
+                props = _snbt_properties(
+                    tuple(
+                        (key, value.__class__, value)
+                        for key, value in sorted(self._properties.items())
+                    )
+                )
+                self._snbt_blockstate += f"[{props}]"
         return self._snbt_blockstate
 
     @property
@@ -261,15 +261,14 @@ def clone(
             offset = numpy.asarray(location).astype(int) - rotation_point
             moved_min_location = src_selection.min_array + offset
 
-            iter_count = len(
-                list(
-                    src_structure.get_moved_coord_slice_box(
-                        src_dimension,
-                        moved_min_location,
-                        src_selection,
-                        dst_structure.sub_chunk_size,
-                        yield_missing_chunks=copy_chunk_not_exist,
-                    )
+            iter_count = sum(
+                1
+                for _ in src_structure.get_moved_coord_slice_box(
+                    src_dimension,
+                    moved_min_location,
+                    src_selection,
+                    dst_structure.sub_chunk_size,
+                    yield_missing_chunks=copy_chunk_not_exist,
                 )
             )
 
@@ -357,9 +356,7 @@ def clone(
                     try:
                         block_mask = src_chunk.blocks[src_slices]
                         mask = paste_blocks[block_mask]
-                        dst_chunk.blocks[dst_slices][mask] = lut[
-                            src_chunk.blocks[src_slices]
-                        ][mask]
+                        dst_chunk.blocks[dst_slices][mask] = lut[block_mask[mask]]
                         dst_chunk.changed = True
                     except IndexError as e:
                         locals_copy = locals().copy()
@@ -59,6 +59,80 @@ def _is_schematic(path: str):
         return False
 
 
+class _LazyChunk(NamedTuple):
+    """A chunk read from the file that has not been decoded yet."""
+
+    selection: SelectionBox
+    block_entities: List[CompoundTag]
+    entities: List[CompoundTag]
+
+
+def _group_by_chunk(
+    tags: List[CompoundTag],
+    coords: numpy.ndarray,
+    selection: SelectionBox,
+    sub_chunk_size: int,
+) -> Iterable[Tuple[ChunkCoordinates, List[CompoundTag]]]:
+    """
+    Group tags by the chunk their coordinate is in.
+    Tags with a coordinate outside the selection are skipped.
+
+    :param tags: The tags to group.
+    :param coords: The x, y and z coordinate of each tag. Shape (len(tags), 3).
+    :param selection: The selection the coordinates must be in. The minimum point must not be negative.
+    :param sub_chunk_size: The width of a chunk.
+    :return: An iterable of chunk coordinates and the tags in that chunk in their original order.
+    """
+    if not tags:
+        return
+    indexes = numpy.flatnonzero(
+        numpy.all(
+            (selection.min_array <= coords) & (coords < selection.max_array), axis=1
+        )
+    )
+    chunk_coords = coords[indexes][:, [0, 2]].astype(numpy.int64) // sub_chunk_size
+    keys = (chunk_coords[:, 0] << 32) | chunk_coords[:, 1]
+    # a stable sort keeps the tags in each chunk in their original order
+    order = numpy.argsort(keys, kind="stable")
+    indexes = indexes[order].tolist()
+    unique_keys, starts = numpy.unique(keys[order], return_index=True)
+    ends = starts[1:].tolist() + [len(indexes)]
+    for key, start, end in zip(unique_keys.tolist(), starts.tolist(), ends):
+        yield (key >> 32, key & 0xFFFFFFFF), [tags[i] for i in indexes[start:end]]
+
+
+def _chunk_column(
+    array: numpy.ndarray, box: SelectionBox, dtype: numpy.dtype
+) -> numpy.ndarray:
+    """
+    Copy the region of a YZX array covered by a box.
+    The copy is made in one pass in the storage order of the array which is much quicker than a transposed copy.
+
+    :param array: The array in YZX order.
+    :param box: The region of the array to copy.
+    :param dtype: The data type of the returned array.
+    :return: A new array in XYZ order. This is a transposed view of a contiguous YZX array.
+    """
+    slice_x, slice_y, slice_z = box.slice
+    return numpy.transpose(array[slice_y, slice_z, slice_x].astype(dtype), (2, 0, 1))
+
+
+def _unpack_add_blocks(
+    add_blocks: numpy.ndarray, shape: Tuple[int, int, int]
+) -> numpy.ndarray:
+    """
+    Unpack the AddBlocks nibbles to one value per block.
+
+    :param add_blocks: The packed AddBlocks array. Each byte stores the upper bits of two blocks. The high nibble is the first block.
+    :param shape: The YZX shape of the schematic.
+    :return: A uint8 array in YZX order.
+    """
+    nibbles = numpy.empty(add_blocks.size * 2, dtype=numpy.uint8)
+    numpy.right_shift(add_blocks, 4, out=nibbles[::2])
+    numpy.bitwise_and(add_blocks, 0xF, out=nibbles[1::2])
+    return nibbles[: shape[0] * shape[1] * shape[2]].reshape(shape)
+
+
 class SchematicFormatWrapper(StructureFormatWrapper[VersionNumberTuple]):
     """
     This FormatWrapper class exists to interface with the legacy schematic structure format.
@@ -77,6 +151,14 @@ class SchematicFormatWrapper(StructureFormatWrapper[VersionNumberTuple]):
             ChunkCoordinates,
             SchematicChunk,
         ] = {}
+        # The chunks in the file are only decoded when they are requested.
+        self._lazy_chunks: Dict[ChunkCoordinates, _LazyChunk] = {}
+        # The raw YZX arrays from the file.
+        self._schematic_blocks: Optional[numpy.ndarray] = None
+        self._schematic_packed_add_blocks: Optional[numpy.ndarray] = None
+        # The AddBlocks nibbles are unpacked the first time a chunk is decoded.
+        self._schematic_add_blocks: Optional[numpy.ndarray] = None
+        self._schematic_data: Optional[numpy.ndarray] = None
 
     def _create(
         self,
@@ -93,7 +175,7 @@ class SchematicFormatWrapper(StructureFormatWrapper[VersionNumberTuple]):
         else:
             self._platform = "java"
             self._version = (1, 12, 2)
-        self._chunks = {}
+        self._clear_chunks()
         self._set_selection(bounds)
         self._is_open = True
         self._has_lock = True
@@ -113,7 +195,7 @@ class SchematicFormatWrapper(StructureFormatWrapper[VersionNumberTuple]):
             raise Exception(
                 f'"{materials}" is not a supported platform for a schematic file.'
             )
-        self._chunks = {}
+        self._clear_chunks()
         selection_box = SelectionBox(
             (0, 0, 0),
             (
@@ -125,57 +207,120 @@ class SchematicFormatWrapper(StructureFormatWrapper[VersionNumberTuple]):
         self._bounds[self.dimensions[0]] = SelectionGroup(selection_box)
         entities: ListTag = schematic.get_list("Entities", ListTag())
         block_entities: ListTag = schematic.get_list("TileEntities", ListTag())
-        blocks: numpy.ndarray = (
+        size_x, size_y, size_z = selection_box.shape
+        temp_shape = (size_y, size_z, size_x)
+        self._schematic_blocks = (
             schematic.get_byte_array("Blocks")
-            .np_array.astype(numpy.uint8)
-            .astype(numpy.uint16)
+            .np_array.view(numpy.uint8)
+            .reshape(temp_shape)
         )
         if "AddBlocks" in schematic:
-            add_blocks = schematic.get_byte_array("AddBlocks").np_array
-            blocks = (
-                blocks
-                + (
-                    numpy.concatenate([[(add_blocks & 0xF0) >> 4], [add_blocks & 0xF]])
-                    .T.ravel()
-                    .astype(numpy.uint16)
-                    << 8
-                )[: blocks.size]
-            )
-        max_point = selection_box.max
-        temp_shape = (max_point[1], max_point[2], max_point[0])
-        blocks = numpy.transpose(blocks.reshape(temp_shape), (2, 0, 1))  # YZX => XYZ
-        data = numpy.transpose(
-            schematic.get_byte_array("Data").np_array.reshape(temp_shape), (2, 0, 1)
-        ).astype(numpy.uint8)
-        for cx, cz in selection_box.chunk_locations():
-            box = SelectionBox(
-                (cx * self.sub_chunk_size, 0, cz * self.sub_chunk_size),
-                (
-                    min((cx + 1) * self.sub_chunk_size, selection_box.size_x),
-                    selection_box.size_y,
-                    min((cz + 1) * self.sub_chunk_size, selection_box.size_z),
-                ),
-            )
-            self._chunks[(cx, cz)] = SchematicChunk(
-                box, blocks[box.slice], data[box.slice], [], []
+            self._schematic_packed_add_blocks = schematic.get_byte_array(
+                "AddBlocks"
+            ).np_array.view(numpy.uint8)
+        self._schematic_data = (
+            schematic.get_byte_array("Data")
+            .np_array.view(numpy.uint8)
+            .reshape(temp_shape)
+        )
+
+        cx_count = -(-size_x // self.sub_chunk_size)
+        cz_count = -(-size_z // self.sub_chunk_size)
+        # the lower and upper bound of each chunk in the x and z axis
+        x_min = numpy.arange(cx_count) * self.sub_chunk_size
+        z_min = numpy.arange(cz_count) * self.sub_chunk_size
+        x_max = numpy.minimum(x_min + self.sub_chunk_size, size_x).tolist()
+        z_max = numpy.minimum(z_min + self.sub_chunk_size, size_z).tolist()
+        x_min = x_min.tolist()
+        z_min = z_min.tolist()
+        # the coordinates of every chunk in the selection in x major order
+        cx_arr, cz_arr = numpy.meshgrid(
+            numpy.arange(cx_count), numpy.arange(cz_count), indexing="ij"
+        )
+        for cx, cz in zip(cx_arr.ravel().tolist(), cz_arr.ravel().tolist()):
+            self._lazy_chunks[(cx, cz)] = _LazyChunk(
+                SelectionBox((x_min[cx], 0, z_min[cz]), (x_max[cx], size_y, z_max[cz])),
+                [],
+                [],
             )
+        block_entity_tags = []
+        block_entity_coords = []
         for e in block_entities:
             if isinstance(e, CompoundTag) and all(key in e for key in ("x", "y", "z")):
-                x = e.get_int("x").py_int
-                y = e.get_int("y").py_int
-                z = e.get_int("z").py_int
-                if (x, y, z) in selection_box:
-                    cx = x >> 4
-                    cz = z >> 4
-                    self._chunks[(cx, cz)].block_entities.append(e)
+                block_entity_tags.append(e)
+                block_entity_coords.append(
+                    (
+                        e.get_int("x").py_int,
+                        e.get_int("y").py_int,
+                        e.get_int("z").py_int,
+                    )
+                )
+        for chunk_coords, tags in _group_by_chunk(
+            block_entity_tags,
+            numpy.array(block_entity_coords, dtype=numpy.int64),
+            selection_box,
+            self.sub_chunk_size,
+        ):
+            self._lazy_chunks[chunk_coords].block_entities.extend(tags)
+
+        entity_tags = []
+        entity_coords = []
         for e in entities:
             if isinstance(e, CompoundTag) and "Pos" in e:
                 pos: PointCoordinates = tuple(map(float, e.get_list("Pos", ListTag())))
                 if len(pos) == 3:
-                    if pos in selection_box:
-                        cx = int(pos[0]) >> 4
-                        cz = int(pos[2]) >> 4
-                        self._chunks[(cx, cz)].entities.append(e)
+                    entity_tags.append(e)
+                    entity_coords.append(pos)
+        for chunk_coords, tags in _group_by_chunk(
+            entity_tags,
+            numpy.array(entity_coords, dtype=numpy.float64),
+            selection_box,
+            self.sub_chunk_size,
+        ):
+            self._lazy_chunks[chunk_coords].entities.extend(tags)
+
+    def _clear_chunks(self):
+        self._chunks = {}
+        self._lazy_chunks = {}
+        self._schematic_blocks = None
+        self._schematic_packed_add_blocks = None
+        self._schematic_add_blocks = None
+        self._schematic_data = None
+
+    def _decode_chunk(self, cx: int, cz: int) -> SchematicChunk:
+        """Decode a chunk from the raw schematic arrays."""
+        lazy_chunk = self._lazy_chunks[(cx, cz)]
+        box = lazy_chunk.selection
+        if (
+            self._schematic_add_blocks is None
+            and self._schematic_packed_add_blocks is not None
+        ):
+            self._schematic_add_blocks = _unpack_add_blocks(
+                self._schematic_packed_add_blocks, self._schematic_blocks.shape
+            )
+            self._schematic_packed_add_blocks = None
+        if self._schematic_add_blocks is None:
+            blocks = _chunk_column(self._schematic_blocks, box, numpy.uint16)
+        else:
+            blocks = _chunk_column(self._schematic_add_blocks, box, numpy.uint16)
+            blocks <<= 8
+            slice_x, slice_y, slice_z = box.slice
+            blocks |= numpy.transpose(
+                self._schematic_blocks[slice_y, slice_z, slice_x], (2, 0, 1)
+            )
+        return SchematicChunk(
+            box,
+            blocks,
+            _chunk_column(self._schematic_data, box, numpy.uint8),
+            copy.deepcopy(lazy_chunk.block_entities),
+            copy.deepcopy(lazy_chunk.entities),
+        )
+
+    def _iter_chunks(self) -> Iterable[SchematicChunk]:
+        """Iterate over all the chunks. Chunks that have not been decoded yet are decoded."""
+        yield from self._chunks.values()
+        for cx, cz in self._lazy_chunks:
+            yield self._decode_chunk(cx, cz)
 
     @staticmethod
     def is_valid(path: str) -> bool:
@@ -239,23 +384,25 @@ class SchematicFormatWrapper(StructureFormatWrapper[VersionNumberTuple]):
             selection.shape, dtype=numpy.uint8
         )  # only 4 bits are used
 
-        for chunk in self._chunks.values():
+        min_x, min_y, min_z = selection.min
+        offset = (-min_x, -min_y, -min_z)
+        for chunk in self._iter_chunks():
             if chunk.selection.intersects(selection):
-                box = chunk.selection.create_moved_box(selection.min, subtract=True)
-                blocks[box.slice] = chunk.blocks
-                block_data[box.slice] = chunk.data
+                box = chunk.selection.create_moved_box(offset)
+                numpy.copyto(blocks[box.slice], chunk.blocks, casting="no")
+                numpy.copyto(block_data[box.slice], chunk.data, casting="no")
                 for be in chunk.block_entities:
                     coord_type = be["x"].__class__
-                    be["x"] = coord_type(be["x"].py_int - selection.min_x)
-                    be["y"] = coord_type(be["y"].py_int - selection.min_y)
-                    be["z"] = coord_type(be["z"].py_int - selection.min_z)
-                    block_entities.append(be)
+                    be["x"] = coord_type(be["x"].py_int - min_x)
+                    be["y"] = coord_type(be["y"].py_int - min_y)
+                    be["z"] = coord_type(be["z"].py_int - min_z)
+                block_entities.extend(chunk.block_entities)
                 for e in chunk.entities:
                     coord_type = e["Pos"][0].__class__
-                    e["Pos"][0] = coord_type(e["Pos"][0] - selection.min_x)
-                    e["Pos"][1] = coord_type(e["Pos"][1] - selection.min_y)
-                    e["Pos"][2] = coord_type(e["Pos"][2] - selection.min_z)
-                    entities.append(e)
+                    e["Pos"][0] = coord_type(e["Pos"][0] - min_x)
+                    e["Pos"][1] = coord_type(e["Pos"][1] - min_y)
+                    e["Pos"][2] = coord_type(e["Pos"][2] - min_z)
+                entities.extend(chunk.entities)
 
         tag["Entities"] = ListTag(entities)
         tag["TileEntities"] = ListTag(block_entities)
@@ -263,14 +410,25 @@ class SchematicFormatWrapper(StructureFormatWrapper[VersionNumberTuple]):
         tag["Blocks"] = ByteArrayTag(
             numpy.transpose((blocks & 0xFF).astype(numpy.uint8), (1, 2, 0))
         )
-        if numpy.max(blocks) > 0xFF:
-            add_blocks = (numpy.transpose(blocks & 0xF00, (1, 2, 0)) >> 8).ravel()
-            tag["AddBlocks"] = ByteArrayTag((add_blocks[::2] << 4) + add_blocks[1::2])
+        add_blocks = numpy.transpose(
+            (blocks >> 8).astype(numpy.uint8), (1, 2, 0)
+        ).ravel()  # XYZ => YZX
+        add_blocks &= 0xF
+        if add_blocks.any():
+            # Pack two blocks per byte. The high nibble is the first block.
+            # If there is an odd number of blocks the low nibble of the last byte is unused.
+            packed_add_blocks = numpy.left_shift(add_blocks[::2], 4)
+            numpy.bitwise_or(
+                packed_add_blocks[: add_blocks.size // 2],
+                add_blocks[1::2],
+                out=packed_add_blocks[: add_blocks.size // 2],
+            )
+            tag["AddBlocks"] = ByteArrayTag(packed_add_blocks)
         NamedTag(tag, "Schematic").save_to(f)
 
     def _close(self):
         """Close the disk database"""
-        self._chunks.clear()
+        self._clear_chunks()
 
     def unload(self):
         pass
@@ -279,9 +437,10 @@ class SchematicFormatWrapper(StructureFormatWrapper[VersionNumberTuple]):
         self, dimension: Optional[Dimension] = None
     ) -> Iterable[ChunkCoordinates]:
         yield from self._chunks.keys()
+        yield from self._lazy_chunks.keys()
 
     def has_chunk(self, cx: int, cz: int, dimension: Dimension) -> bool:
-        return (cx, cz) in self._chunks
+        return (cx, cz) in self._chunks or (cx, cz) in self._lazy_chunks
 
     def _pack(
         self,
@@ -346,6 +505,8 @@ class SchematicFormatWrapper(StructureFormatWrapper[VersionNumberTuple]):
     def _delete_chunk(self, cx: int, cz: int, dimension: Optional[Dimension] = None):
         if (cx, cz) in self._chunks:
             del self._chunks[(cx, cz)]
+        if (cx, cz) in self._lazy_chunks:
+            del self._lazy_chunks[(cx, cz)]
 
     def _put_raw_chunk_data(
         self,
@@ -355,6 +516,7 @@ class SchematicFormatWrapper(StructureFormatWrapper[VersionNumberTuple]):
         dimension: Optional[Dimension] = None,
     ):
         self._chunks[(cx, cz)] = copy.deepcopy(section)
+        self._lazy_chunks.pop((cx, cz), None)
 
     def _get_raw_chunk_data(
         self, cx: int, cz: int, dimension: Optional[Dimension] = None
@@ -369,5 +531,7 @@ class SchematicFormatWrapper(StructureFormatWrapper[VersionNumberTuple]):
         """
         if (cx, cz) in self._chunks:
             return copy.deepcopy(self._chunks[(cx, cz)])
+        elif (cx, cz) in self._lazy_chunks:
+            return self._decode_chunk(cx, cz)
         else:
             raise ChunkDoesNotExist
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import logging
+from functools import lru_cache
 from typing import Dict, Set, Tuple, Iterable, Optional, TYPE_CHECKING
 
 import numpy
@@ -29,6 +30,42 @@ if TYPE_CHECKING:
 
 log = logging.getLogger(__name__)
 
+# The index of each block in a YZX ordered section in XYZ order.
+# Used to decode the section directly into XYZ order.
+_block_section_xyz_order = numpy.transpose(
+    numpy.arange(16**3).reshape((16, 16, 16)), (2, 0, 1)
+).ravel()
+# read only so that decode_long_array can cache the layout for this order
+_block_section_xyz_order.flags.writeable = False
+
+
+@lru_cache(maxsize=2**16)
+def _decode_block(name: str, properties: Tuple[Tuple[str, StringTag], ...]) -> Block:
+    """
+    Create a Block from the name and properties of a palette entry.
+    The same blockstates are found in most chunks so the Block instances are cached and shared.
+    Block is immutable so sharing is safe and the cached blockstate strings are reused when hashing.
+    """
+    namespace, base_name = name.split(":", 1)
+    return Block(namespace=namespace, base_name=base_name, properties=dict(properties))
+
+
+@lru_cache(maxsize=2**16)
+def _encode_block(
+    block: Block,
+) -> Tuple[StringTag, Tuple[Tuple[str, StringTag], ...]]:
+    """
+    Get the name tag and the string properties of a palette entry for a Block.
+    This is the reverse of _decode_block and is cached for the same reason.
+    The tags are immutable so they can be shared between palette entries.
+    The CompoundTags holding them are mutable so they are created for each entry.
+    """
+    return StringTag(block.namespaced_name), tuple(
+        (key, value)
+        for key, value in block.properties.items()
+        if isinstance(value, StringTag)
+    )
+
 
 class Anvil1444Interface(ParentInterface):
     """
@@ -109,9 +146,9 @@ class Anvil1444Interface(ParentInterface):
             4096,
             max(4, (len(section_palette) - 1).bit_length()),
             dense=self.LongArrayDense,
+            order=_block_section_xyz_order,
         ).astype(numpy.uint32)
-        arr = numpy.transpose(decoded.reshape((16, 16, 16)), (2, 0, 1))
-        return arr, section_palette
+        return decoded.reshape((16, 16, 16)), section_palette
 
     def _decode_blocks(
         self, chunk: Chunk, data: ChunkDataType, floor_cy: int, height_cy: int
@@ -123,29 +160,32 @@ class Anvil1444Interface(ParentInterface):
             data = self._decode_block_section(section)
             if data is not None:
                 arr, section_palette = data
-                blocks[cy] = arr + len(palette)
+                arr += len(palette)
+                blocks[cy] = arr
                 palette += section_palette
 
-        np_palette, inverse = numpy.unique(palette, return_inverse=True)
-        np_palette: numpy.ndarray
-        inverse: numpy.ndarray
-        inverse = inverse.astype(numpy.uint32)
+        # merge duplicate blocks using a dictionary.
+        # numpy.unique would sort the objects which is slow.
+        block_indexes: Dict[Block, int] = {}
+        lut = numpy.array(
+            [block_indexes.setdefault(block, len(block_indexes)) for block in palette],
+            dtype=numpy.uint32,
+        )
         for cy in blocks:
-            blocks[cy] = inverse[blocks[cy]]
+            # indexing raises an IndexError if a section references past the end of the palette
+            blocks[cy] = lut[blocks[cy]]
         chunk.blocks = blocks
-        chunk.misc["block_palette"] = np_palette
+        chunk.misc["block_palette"] = numpy.array(list(block_indexes), dtype=object)
 
     @staticmethod
     def _decode_block_palette(palette: ListTag) -> list:
-        blockstates = []
-        for entry in palette:
-            namespace, base_name = entry.get_string("Name").py_str.split(":", 1)
-            properties = entry.get_compound("Properties", CompoundTag({})).py_dict
-            block = Block(
-                namespace=namespace, base_name=base_name, properties=properties
+        return [
+            _decode_block(
+                entry.get_string("Name").py_str,
+                tuple(entry.get_compound("Properties", CompoundTag({})).items()),
             )
-            blockstates.append(block)
-        return blockstates
+            for entry in palette
+        ]
 
     @staticmethod
     def _decode_to_be_ticked(ticks: ListTag, floor_cy: int) -> Set[BlockCoordinates]:
@@ -210,6 +250,27 @@ class Anvil1444Interface(ParentInterface):
             data, self.InhabitedTime, LongTag(chunk.misc.get("inhabited_time", 0))
         )
 
+    @staticmethod
+    def _unique_section_blocks(
+        block_sub_array: numpy.ndarray,
+    ) -> Tuple[numpy.ndarray, numpy.ndarray]:
+        """
+        Find the palette indexes used in a section and remap the section to index into them.
+
+        :param block_sub_array: The flat section array indexing into the chunk palette.
+        :return: The sorted palette indexes used and the remapped section array.
+        """
+        max_value = int(block_sub_array.max()) + 1
+        if max_value <= block_sub_array.size:
+            # a histogram is quicker than sorting when the range of values is small
+            sub_palette = numpy.flatnonzero(
+                numpy.bincount(block_sub_array, minlength=max_value)
+            )
+            lut = numpy.zeros(max_value, dtype=numpy.uint32)
+            lut[sub_palette] = numpy.arange(sub_palette.size, dtype=numpy.uint32)
+            return sub_palette, lut[block_sub_array]
+        return numpy.unique(block_sub_array, return_inverse=True)
+
     def _encode_block_section(
         self,
         chunk: Chunk,
@@ -221,9 +282,7 @@ class Anvil1444Interface(ParentInterface):
             chunk.blocks.get_sub_chunk(cy), (1, 2, 0)
         ).ravel()
 
-        sub_palette_, block_sub_array = numpy.unique(
-            block_sub_array, return_inverse=True
-        )
+        sub_palette_, block_sub_array = self._unique_section_blocks(block_sub_array)
         sub_palette = self._encode_block_palette(palette[sub_palette_])
         if (
             len(sub_palette) == 1
@@ -240,21 +299,18 @@ class Anvil1444Interface(ParentInterface):
         section["Palette"] = sub_palette
 
     @staticmethod
-    def _encode_block_palette(blockstates: Iterable[Block]) -> ListTag:
-        palette = ListTag()
-        for block in blockstates:
-            entry = CompoundTag()
-            entry["Name"] = StringTag(f"{block.namespace}:{block.base_name}")
-            if block.properties:
-                string_properties = {
-                    k: v
-                    for k, v in block.properties.items()
-                    if isinstance(v, StringTag)
-                }
-                if string_properties:
-                    entry["Properties"] = CompoundTag(string_properties)
-            palette.append(entry)
-        return palette
+    def _encode_block_palette_entry(block: Block) -> CompoundTag:
+        name, string_properties = _encode_block(block)
+        entry = CompoundTag({"Name": name})
+        if string_properties:
+            entry["Properties"] = CompoundTag(dict(string_properties))
+        return entry
+
+    @classmethod
+    def _encode_block_palette(cls, blockstates: Iterable[Block]) -> ListTag:
+        return ListTag(
+            [cls._encode_block_palette_entry(block) for block in blockstates]
+        )
 
     @staticmethod
     def _encode_to_be_ticked(
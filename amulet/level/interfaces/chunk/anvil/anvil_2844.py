@@ -27,6 +27,14 @@ from .base_anvil_interface import (
 from .anvil_2709 import (
     Anvil2709Interface as ParentInterface,
 )
+from .anvil_1444 import _block_section_xyz_order
+
+# The index of each biome in a YZX ordered section in XYZ order.
+_biome_section_xyz_order = numpy.transpose(
+    numpy.arange(4**3).reshape((4, 4, 4)), (2, 0, 1)
+).ravel()
+# read only so that decode_long_array can cache the layout for this order
+_biome_section_xyz_order.flags.writeable = False
 
 
 class Anvil2844Interface(ParentInterface):
@@ -100,13 +108,17 @@ class Anvil2844Interface(ParentInterface):
             if data is None:
                 arr = numpy.zeros((16, 16, 16), numpy.uint32)
             else:
-                decoded = decode_long_array(
-                    data.np_array,
-                    16**3,
-                    max(4, (len(section_palette) - 1).bit_length()),
-                    dense=self.LongArrayDense,
-                ).astype(numpy.uint32)
-                arr = numpy.transpose(decoded.reshape((16, 16, 16)), (2, 0, 1))
+                arr = (
+                    decode_long_array(
+                        data.np_array,
+                        16**3,
+                        max(4, (len(section_palette) - 1).bit_length()),
+                        dense=self.LongArrayDense,
+                        order=_block_section_xyz_order,
+                    )
+                    .astype(numpy.uint32)
+                    .reshape((16, 16, 16))
+                )
             return arr, section_palette
         else:
             return None
@@ -129,16 +141,16 @@ class Anvil2844Interface(ParentInterface):
                 arr = numpy.zeros((4, 4, 4), numpy.uint32)
             else:
                 # case 2: palette contains values and data is an index array
-                arr = numpy.transpose(
+                arr = (
                     decode_long_array(
                         data.np_array,
                         4**3,
                         max(1, (len(section_palette) - 1).bit_length()),
                         dense=self.LongArrayDense,
+                        order=_biome_section_xyz_order,
                     )
                     .astype(numpy.uint32)
-                    .reshape((4, 4, 4)),
-                    (2, 0, 1),
+                    .reshape((4, 4, 4))
                 )
             return arr, section_palette
         else:
@@ -195,9 +207,7 @@ class Anvil2844Interface(ParentInterface):
             chunk.blocks.get_sub_chunk(cy), (1, 2, 0)
         ).ravel()
 
-        sub_palette_, block_sub_array = numpy.unique(
-            block_sub_array, return_inverse=True
-        )
+        sub_palette_, block_sub_array = self._unique_section_blocks(block_sub_array)
         sub_palette = self._encode_block_palette(palette[sub_palette_])
         section = sections.setdefault(cy, CompoundTag())
         block_states = section["block_states"] = CompoundTag({"palette": sub_palette})
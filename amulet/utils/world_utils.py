@@ -2,9 +2,10 @@ from __future__ import annotations
 
 import math
 import sys
+from functools import lru_cache
 import gzip
 from io import StringIO
-from typing import Tuple, Optional
+from typing import Tuple, Optional, NamedTuple
 import numpy
 from numpy import ndarray, zeros, uint8
 from amulet.api.data_types import ChunkCoordinates
@@ -135,12 +136,119 @@ The functions below can be used to pack and unpack both formats.
 """
 
 
+class _LongArrayLayout(NamedTuple):
+    """Where each entry of a long array is stored."""
+
+    long_count: int
+    # the long each entry starts in
+    long_index: numpy.ndarray
+    # the bit offset within that long where each entry starts
+    bit_offset: numpy.ndarray
+    # the index of the first entry starting in each long
+    starts: numpy.ndarray
+    # the indexes of the entries that continue into the next long (dense only)
+    straddle: numpy.ndarray
+    # the number of bits of each straddling entry stored in the first long
+    straddle_shift: numpy.ndarray
+
+
+@lru_cache(maxsize=64)
+def _long_array_layout(size: int, bits_per_entry: int, dense: bool) -> _LongArrayLayout:
+    """
+    Get the layout of a long array with the given parameters.
+    Chunk data only uses a handful of sizes and bit depths so this is cached
+    and the index arithmetic is only done once for each combination.
+    The returned arrays are read only because they are shared.
+    """
+    if dense:
+        long_count = math.ceil(size * bits_per_entry / 64)
+    else:
+        long_count = math.ceil(size / (64 // bits_per_entry))
+    # find the long and the bit offset within that long where each entry starts
+    entry_index = numpy.arange(size, dtype=numpy.int64)
+    if dense:
+        bit_index = entry_index * bits_per_entry
+    else:
+        entry_per_long = 64 // bits_per_entry
+        bit_index = (entry_index // entry_per_long << 6) + (
+            entry_index % entry_per_long
+        ) * bits_per_entry
+    long_index = bit_index >> 6
+    bit_offset = (bit_index & 63).astype(numpy.uint64)
+    # long_index is sorted so each run of equal values is one long.
+    starts = numpy.flatnonzero(numpy.diff(long_index, prepend=-1))
+    if dense:
+        # entries in the dense format may straddle two longs.
+        straddle = numpy.flatnonzero(bit_offset > 64 - bits_per_entry)
+    else:
+        straddle = numpy.zeros(0, dtype=numpy.int64)
+    straddle_shift = 64 - bit_offset[straddle]
+    layout = _LongArrayLayout(
+        long_count, long_index, bit_offset, starts, straddle, straddle_shift
+    )
+    for arr in layout[1:]:
+        arr.flags.writeable = False
+    return layout
+
+
+class _OrderKey:
+    """Hash a read only order array by identity so that its layout can be cached."""
+
+    __slots__ = ("order",)
+
+    def __init__(self, order: numpy.ndarray):
+        self.order = order
+
+    def __hash__(self):
+        return id(self.order)
+
+    def __eq__(self, other):
+        return isinstance(other, _OrderKey) and other.order is self.order
+
+
+def _order_long_array_layout(
+    layout: _LongArrayLayout, order: numpy.ndarray, bits_per_entry: int
+) -> _LongArrayLayout:
+    """
+    Reorder the entries of a layout.
+    The starts field is empty because the entries are no longer in storage order.
+    """
+    long_index = layout.long_index[order]
+    bit_offset = layout.bit_offset[order]
+    straddle = numpy.flatnonzero(bit_offset > 64 - bits_per_entry)
+    return _LongArrayLayout(
+        layout.long_count,
+        long_index,
+        bit_offset,
+        numpy.zeros(0, dtype=numpy.int64),
+        straddle,
+        64 - bit_offset[straddle],
+    )
+
+
+@lru_cache(maxsize=64)
+def _ordered_long_array_layout(
+    size: int, bits_per_entry: int, dense: bool, order_key: _OrderKey
+) -> _LongArrayLayout:
+    """
+    Get the layout of a long array with the entries in the given order.
+    The key holds a reference to the order array so its id cannot be reused while it is cached.
+    """
+    layout = _order_long_array_layout(
+        _long_array_layout(size, bits_per_entry, dense), order_key.order, bits_per_entry
+    )
+    for arr in layout[1:]:
+        arr.flags.writeable = False
+    return layout
+
+
 def decode_long_array(
     long_array: numpy.ndarray,
     size: int,
     bits_per_entry: int,
     dense=True,
     signed: bool = False,
+    order: Optional[numpy.ndarray] = None,
 ) -> numpy.ndarray:
     """
     Decode a long array (from BlockStates or Heightmaps)
@@ -150,6 +258,7 @@ def decode_long_array(
     :param bits_per_entry: The number of bits per entry in the encoded array.
     :param dense: If true the long arrays will be treated as a bit stream. If false they are distinct values with padding
     :param signed: Should the returned array be signed.
+    :param order: An optional array of entry indexes to return the entries in. This can be used to transpose the data while decoding it. If the array is read only the reordered layout is cached.
     :return: Decoded array as numpy array
     """
     # validate the inputs and throw an error if there is a problem
@@ -160,50 +269,52 @@ def decode_long_array(
         1 <= bits_per_entry <= 64
     ), f"bits_per_entry must be between 1 and 64 inclusive. Got {bits_per_entry}"
 
-    # force the array to be a signed long array
-    long_array = long_array.astype(">q")
+    # reinterpret the array as unsigned longs so that shifting does not sign extend
+    long_array = long_array.astype(numpy.int64).view(numpy.uint64)
 
-    if dense:
-        expected_len = math.ceil(size * bits_per_entry / 64)
-    else:
-        expected_len = math.ceil(size / (64 // bits_per_entry))
-    if len(long_array) != expected_len:
+    layout = _long_array_layout(size, bits_per_entry, dense)
+    if len(long_array) != layout.long_count:
         raise Exception(
-            f"{'Dense e' if dense else 'E'}ncoded long array with {bits_per_entry} bits per entry should contain {expected_len} longs but got {len(long_array)}."
+            f"{'Dense e' if dense else 'E'}ncoded long array with {bits_per_entry} bits per entry should contain {layout.long_count} longs but got {len(long_array)}."
         )
 
-    # unpack the long array into a bit array
-    bits = numpy.unpackbits(long_array[::-1].astype(">i8").view("uint8"))
-    if dense:
-        if bits.size % bits_per_entry:
-            # if the array is densely packed and there is extra padding, remove it
-            bits = bits[bits.size % bits_per_entry :]
-    else:
-        # if not densely packed remove the padding per long
-        entry_per_long = 64 // bits_per_entry
-        bits = bits.reshape(-1, 64)[:, -entry_per_long * bits_per_entry :]
+    if order is not None:
+        if order.flags.writeable:
+            # the order may be modified after this call so it cannot be cached
+            layout = _order_long_array_layout(layout, order, bits_per_entry)
+        else:
+            layout = _ordered_long_array_layout(
+                size, bits_per_entry, dense, _OrderKey(order)
+            )
 
-    byte_length = 2 ** math.ceil(math.log(math.ceil(bits_per_entry / 8), 2))
-    dtype = {1: "B", 2: ">H", 4: ">I", 8: ">Q"}[byte_length]
-
-    # pad the bits to fill one of the above data types
-    arr = numpy.packbits(
-        numpy.pad(
-            bits.reshape(-1, bits_per_entry)[-size:, :],
-            [(0, 0), (byte_length * 8 - bits_per_entry, 0)],
-            "constant",
+    # shift each entry down to the bottom of the long
+    arr = long_array[layout.long_index] >> layout.bit_offset
+    if layout.straddle.size:
+        # The upper bits of entries straddling two longs are at the bottom of the next long.
+        arr[layout.straddle] |= (
+            long_array[layout.long_index[layout.straddle] + 1] << layout.straddle_shift
         )
-    ).view(dtype=dtype)[::-1]
+    if bits_per_entry < 64:
+        # remove the bits belonging to the following entries
+        arr &= numpy.uint64((1 << bits_per_entry) - 1)
+
+    byte_length = 2 ** math.ceil(math.log(math.ceil(bits_per_entry / 8), 2))
     if signed:
         # convert to a signed array if requested
-        sarray = arr.astype({1: "b", 2: ">h", 4: ">i", 8: ">q"}[byte_length])
         if bits_per_entry < 64:
-            mask = arr >= 2 ** (bits_per_entry - 1)
-            sarray[mask] = numpy.subtract(
-                arr[mask], 2**bits_per_entry, dtype=numpy.int64
+            # sign extend the negative values
+            arr[arr >> numpy.uint64(bits_per_entry - 1) == 1] |= numpy.uint64(
+                (2**64 - 1) ^ ((1 << bits_per_entry) - 1)
             )
-        arr = sarray
-    return arr
+        return arr.view(numpy.int64).astype(
+            {1: numpy.int8, 2: numpy.int16, 4: numpy.int32, 8: numpy.int64}[byte_length]
+        )
+    else:
+        return arr.astype(
+            {1: numpy.uint8, 2: numpy.uint16, 4: numpy.uint32, 8: numpy.uint64}[
+                byte_length
+            ]
+        )
 
 
 def encode_long_array(
@@ -224,8 +335,8 @@ def encode_long_array(
     assert (
         1 <= min_bits_per_entry <= 64
     ), f"min_bits_per_entry must be between 1 and 64 inclusive. Got {bits_per_entry}"
-    # cast to a signed longlong array
-    array = array.astype(">q")
+    # cast to a flat signed long array
+    array = array.astype(numpy.int64).ravel()
     # work out how many bits are required to store the
     required_bits_per_entry = max(
         max(
@@ -250,47 +361,25 @@ def encode_long_array(
         raise ValueError(
             "bits_per_entry must be an int between 1 and 64 inclusive or None."
         )
-    # make the negative values positive to make bit storage easier
-    uarray = array.astype(">Q")
+    # reinterpret the values as unsigned so that negative values are stored as two's complement
+    array = array.view(numpy.uint64)
     if bits_per_entry < 64:
-        mask = array < 0
-        uarray[mask] = numpy.add(
-            array[mask], 2**bits_per_entry, dtype=numpy.uint64, casting="unsafe"
+        array = array & numpy.uint64((1 << bits_per_entry) - 1)
+
+    layout = _long_array_layout(array.size, bits_per_entry, dense)
+    long_array = numpy.zeros(layout.long_count, dtype=numpy.uint64)
+    if array.size:
+        # The entries do not overlap so the entries starting in each long can be or-ed together.
+        long_array[layout.long_index[layout.starts]] = numpy.bitwise_or.reduceat(
+            array << layout.bit_offset, layout.starts
         )
-    array = uarray
-
-    # unpack the individual values into a bit array
-    bits: numpy.ndarray = numpy.unpackbits(
-        numpy.ascontiguousarray(array[::-1]).view("uint8")
-    ).reshape(-1, 64)[:, -bits_per_entry:]
-    if dense:
-        if bits.size % 64:
-            # if the bit array does not fill a whole long
-            # add padding to the last long if required
-            bits = numpy.pad(
-                bits.ravel(),
-                [(64 - (bits.size % 64), 0)],
-                "constant",
-            )
-    else:
-        # if the array is not dense add padding
-        entry_per_long = 64 // bits_per_entry
-        if bits.shape[0] % entry_per_long:
-            # add padding to the last long if required
-            bits = numpy.pad(
-                bits,
-                [(entry_per_long - (bits.shape[0] % entry_per_long), 0), (0, 0)],
-                "constant",
+        if layout.straddle.size:
+            # The upper bits of entries straddling two longs go at the bottom of the next long.
+            long_array[layout.long_index[layout.straddle] + 1] |= (
+                array[layout.straddle] >> layout.straddle_shift
             )
-        # add padding for each long
-        bits = numpy.pad(
-            bits.reshape(-1, bits_per_entry * entry_per_long),
-            [(0, 0), (64 - bits_per_entry * entry_per_long, 0)],
-            "constant",
-        )
 
-    # pack the bits into a long array
-    return numpy.packbits(bits).view(dtype=">q")[::-1]
+    return long_array.view(numpy.int64)
 
 
 def get_size(obj, seen=None):
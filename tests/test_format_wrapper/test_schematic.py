@@ -0,0 +1,243 @@
+import unittest
+from typing import Tuple
+
+import numpy
+from amulet_nbt import (
+    CompoundTag,
+    ShortTag,
+    IntTag,
+    DoubleTag,
+    StringTag,
+    ListTag,
+    ByteArrayTag,
+    NamedTag,
+    load as load_nbt,
+)
+
+from amulet.level.formats.schematic import SchematicFormatWrapper
+
+from data.util import clean_temp_world, clean_path
+
+
+def create_schematic(
+    path: str, blocks: numpy.ndarray, data: numpy.ndarray, entity_count: int = 0
+) -> Tuple[ListTag, ListTag]:
+    """
+    Write a legacy schematic file.
+
+    :param path: The path to write to.
+    :param blocks: The block ids in XYZ order. Ids above 255 are stored in AddBlocks.
+    :param data: The block data in XYZ order.
+    :param entity_count: The number of block entities and entities to add at random locations.
+    :return: The block entities and entities that were written.
+    """
+    size_x, size_y, size_z = blocks.shape
+    blocks = numpy.transpose(blocks, (1, 2, 0)).ravel()  # XYZ => YZX
+    data = numpy.transpose(data, (1, 2, 0)).ravel()
+    add_blocks = (blocks >> 8).astype(numpy.uint8)
+    if add_blocks.size % 2:
+        add_blocks = numpy.append(add_blocks, 0)
+    block_entities = ListTag(
+        [
+            CompoundTag(
+                {
+                    "id": StringTag("Chest"),
+                    "x": IntTag(int(numpy.random.randint(size_x))),
+                    "y": IntTag(int(numpy.random.randint(size_y))),
+                    "z": IntTag(int(numpy.random.randint(size_z))),
+                }
+            )
+            for _ in range(entity_count)
+        ]
+    )
+    entities = ListTag(
+        [
+            CompoundTag(
+                {
+                    "id": StringTag("Pig"),
+                    "Pos": ListTag(
+                        [
+                            DoubleTag(float(numpy.random.uniform(0, size_x))),
+                            DoubleTag(float(numpy.random.uniform(0, size_y))),
+                            DoubleTag(float(numpy.random.uniform(0, size_z))),
+                        ]
+                    ),
+                }
+            )
+            for _ in range(entity_count)
+        ]
+    )
+    NamedTag(
+        CompoundTag(
+            {
+                "Width": ShortTag(size_x),
+                "Height": ShortTag(size_y),
+                "Length": ShortTag(size_z),
+                "Materials": StringTag("Alpha"),
+                "Blocks": ByteArrayTag((blocks & 0xFF).astype(numpy.uint8)),
+                "AddBlocks": ByteArrayTag((add_blocks[::2] << 4) | add_blocks[1::2]),
+                "Data": ByteArrayTag(data),
+                "TileEntities": block_entities,
+                "Entities": entities,
+            }
+        ),
+        "Schematic",
+    ).save_to(path)
+    return block_entities, entities
+
+
+class SchematicTestCase(unittest.TestCase):
+    def setUp(self):
+        self.path = clean_temp_world("test.schematic")
+
+    def tearDown(self):
+        clean_path(self.path)
+
+    def test_read(self):
+        shape = (37, 9, 21)
+        blocks = numpy.random.randint(0, 4096, shape).astype(numpy.uint16)
+        data = numpy.random.randint(0, 16, shape).astype(numpy.uint8)
+        block_entities, entities = create_schematic(self.path, blocks, data, 50)
+
+        level = SchematicFormatWrapper(self.path)
+        level.open()
+        dimension = level.dimensions[0]
+        self.assertEqual(
+            sorted(level.all_chunk_coords(dimension)),
+            [(cx, cz) for cx in range(3) for cz in range(2)],
+        )
+        read_block_entities = []
+        read_entities = []
+        for cx, cz in level.all_chunk_coords(dimension):
+            chunk = level._get_raw_chunk_data(cx, cz, dimension)
+            box_slice = chunk.selection.slice
+            numpy.testing.assert_array_equal(chunk.blocks, blocks[box_slice])
+            numpy.testing.assert_array_equal(chunk.data, data[box_slice])
+            for block_entity in chunk.block_entities:
+                self.assertEqual(
+                    (block_entity["x"].py_int // 16, block_entity["z"].py_int // 16),
+                    (cx, cz),
+                )
+            for entity in chunk.entities:
+                self.assertEqual(
+                    (
+                        int(entity["Pos"][0].py_float) // 16,
+                        int(entity["Pos"][2].py_float) // 16,
+                    ),
+                    (cx, cz),
+                )
+            read_block_entities += chunk.block_entities
+            read_entities += chunk.entities
+        self.assertEqual(
+            sorted(map(repr, block_entities)), sorted(map(repr, read_block_entities))
+        )
+        self.assertEqual(sorted(map(repr, entities)), sorted(map(repr, read_entities)))
+
+        # the returned chunk is a copy
+        chunk = level._get_raw_chunk_data(0, 0, dimension)
+        chunk.blocks[:] = 0
+        numpy.testing.assert_array_equal(
+            level._get_raw_chunk_data(0, 0, dimension).blocks,
+            blocks[chunk.selection.slice],
+        )
+        level.close()
+
+    def test_round_trip(self):
+        shape = (37, 9, 21)
+        blocks = numpy.random.randint(0, 4096, shape).astype(numpy.uint16)
+        data = numpy.random.randint(0, 16, shape).astype(numpy.uint8)
+        block_entities, entities = create_schematic(self.path, blocks, data, 50)
+
+        level = SchematicFormatWrapper(self.path)
+        level.open()
+        dimension = level.dimensions[0]
+
+        # modify a chunk
+        chunk = level._get_raw_chunk_data(1, 0, dimension)
+        chunk.blocks[:] = 300
+        chunk.data[:] = 5
+        level._put_raw_chunk_data(1, 0, chunk, dimension)
+        blocks[chunk.selection.slice] = 300
+        data[chunk.selection.slice] = 5
+
+        # delete a chunk
+        chunk = level._get_raw_chunk_data(2, 1, dimension)
+        level._delete_chunk(2, 1, dimension)
+        self.assertFalse(level.has_chunk(2, 1, dimension))
+        blocks[chunk.selection.slice] = 0
+        data[chunk.selection.slice] = 0
+        deleted_box = chunk.selection
+
+        level.save()
+        level.close()
+
+        schematic = load_nbt(self.path).compound
+        self.assertIn("AddBlocks", schematic)
+
+        level = SchematicFormatWrapper(self.path)
+        level.open()
+        for cx, cz in level.all_chunk_coords(dimension):
+            chunk = level._get_raw_chunk_data(cx, cz, dimension)
+            box_slice = chunk.selection.slice
+            numpy.testing.assert_array_equal(chunk.blocks, blocks[box_slice])
+            numpy.testing.assert_array_equal(chunk.data, data[box_slice])
+        level.close()
+
+        # the block entities and entities in the deleted chunk are removed
+        def in_deleted(x, z):
+            return (
+                deleted_box.min_x <= x < deleted_box.max_x
+                and deleted_box.min_z <= z < deleted_box.max_z
+            )
+
+        self.assertEqual(
+            sorted(
+                repr(tag)
+                for tag in block_entities
+                if not in_deleted(tag["x"].py_int, tag["z"].py_int)
+            ),
+            sorted(map(repr, schematic.get_list("TileEntities"))),
+        )
+        self.assertEqual(
+            len(
+                [
+                    tag
+                    for tag in entities
+                    if not in_deleted(tag["Pos"][0].py_float, tag["Pos"][2].py_float)
+                ]
+            ),
+            len(schematic.get_list("Entities")),
+        )
+
+    def test_add_blocks_odd_size(self):
+        # An odd number of blocks leaves the low nibble of the last AddBlocks byte unused.
+        for shape in ((1, 1, 1), (3, 1, 1), (3, 3, 3), (17, 1, 3)):
+            with self.subTest(shape=shape):
+                blocks = numpy.random.randint(256, 4096, shape).astype(numpy.uint16)
+                data = numpy.random.randint(0, 16, shape).astype(numpy.uint8)
+                create_schematic(self.path, blocks, data)
+
+                level = SchematicFormatWrapper(self.path)
+                level.open()
+                level.save()
+                level.close()
+
+                schematic = load_nbt(self.path).compound
+                self.assertEqual(
+                    len(schematic.get_byte_array("AddBlocks")),
+                    (blocks.size + 1) // 2,
+                )
+
+                level = SchematicFormatWrapper(self.path)
+                level.open()
+                dimension = level.dimensions[0]
+                for cx, cz in level.all_chunk_coords(dimension):
+                    chunk = level._get_raw_chunk_data(cx, cz, dimension)
+                    box_slice = chunk.selection.slice
+                    numpy.testing.assert_array_equal(chunk.blocks, blocks[box_slice])
+                    numpy.testing.assert_array_equal(chunk.data, data[box_slice])
+                level.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
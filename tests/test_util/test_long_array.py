@@ -62,6 +62,31 @@ class LongArrayTestCase(unittest.TestCase):
                             f"Long array does not equal. Dense: {dense}, bits per entry: {bits_per_entry}, size: {size}",
                         )
 
+    def test_decode_order(self):
+        order = numpy.transpose(
+            numpy.arange(16**3).reshape((16, 16, 16)), (2, 0, 1)
+        ).ravel()
+        read_only_order = order.copy()
+        # the layout of read only orders is cached
+        read_only_order.flags.writeable = False
+        for order_ in (order, read_only_order):
+            for dense in (False, True):
+                for bits_per_entry in (4, 5, 9, 33):
+                    arr = numpy.random.randint(0, 2**bits_per_entry, 16**3)
+                    packed = encode_long_array(arr, bits_per_entry, dense)
+                    for _ in range(2):
+                        numpy.testing.assert_array_equal(
+                            arr[order_],
+                            decode_long_array(
+                                packed,
+                                len(arr),
+                                bits_per_entry,
+                                dense=dense,
+                                order=order_,
+                            ),
+                            f"Long array does not equal. Dense: {dense}, bits per entry: {bits_per_entry}",
+                        )
+
 
 if __name__ == "__main__":
     unittest.main()